@@ -0,0 +1,57 @@
+"""Migration that stores each form's UUID as its MongoDB _id.
+
+Forms used to keep the UUID in an `id` field next to an ObjectId `_id`.
+entrypoint.sh runs this before Uvicorn starts its workers; it is a no-op once
+every form has been rewritten, so it is safe to re-run:
+
+    cd backend && python migrate_form_ids.py
+"""
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import DuplicateKeyError
+import os
+import asyncio
+import logging
+from pathlib import Path
+
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+logger = logging.getLogger(__name__)
+
+
+async def migrate_legacy_form_ids(forms) -> int:
+    migrated = 0
+    async for form in forms.find({"id": {"$exists": True}}):
+        legacy_id = form.pop("_id")
+        form["_id"] = form.pop("id")
+        if legacy_id == form["_id"]:
+            await forms.update_one({"_id": legacy_id}, {"$unset": {"id": ""}})
+        else:
+            try:
+                await forms.insert_one(form)
+            except DuplicateKeyError:
+                # Rewritten by an earlier, interrupted run
+                pass
+            await forms.delete_one({"_id": legacy_id})
+        migrated += 1
+    return migrated
+
+
+async def main() -> None:
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    try:
+        forms = client[os.environ['DB_NAME']].forms
+        migrated = await migrate_legacy_form_ids(forms)
+        logger.info("Migrated %d forms to UUID _id", migrated)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    asyncio.run(main())
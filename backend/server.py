@@ -1,14 +1,21 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, IndexModel, ReturnDocument
+from pymongo.errors import PyMongoError, ServerSelectionTimeoutError
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
 import os
+import asyncio
+import orjson
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field
 from typing import List, Dict, Any, Optional, Union
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 
 
 ROOT_DIR = Path(__file__).parent
@@ -16,11 +23,48 @@ load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# One client per process; size the pool so workers * MONGO_MAX_POOL_SIZE stays
+# within the server's connection limit
+client = AsyncIOMotorClient(
+    mongo_url,
+    maxPoolSize=int(os.environ.get('MONGO_MAX_POOL_SIZE', '50')),
+    minPoolSize=int(os.environ.get('MONGO_MIN_POOL_SIZE', '5')),
+    serverSelectionTimeoutMS=2000,
+    waitQueueTimeoutMS=1000,
+    retryWrites=True,
+    tz_aware=True
+)
 db = client[os.environ['DB_NAME']]
 
-# Create the main app without a prefix
-app = FastAPI()
+# Redis response cache for form reads (disabled when REDIS_URL is not set).
+# Run Redis with maxmemory-policy allkeys-lfu so the long-lived stale copies
+# below are evicted by use rather than crowding out fresh entries.
+redis_url = os.environ.get('REDIS_URL')
+# Short socket timeouts so a slow or unreachable Redis falls back to MongoDB quickly
+cache = aioredis.from_url(
+    redis_url,
+    socket_connect_timeout=float(os.environ.get('REDIS_CONNECT_TIMEOUT', '0.2')),
+    socket_timeout=float(os.environ.get('REDIS_SOCKET_TIMEOUT', '0.2'))
+) if redis_url else None
+CACHE_TTL = int(os.environ.get('FORMS_CACHE_TTL', '60'))
+# Form reads and listing pages are keyed by a generation that every form write
+# bumps, so a read that started before a write can only fill a retired key
+FORMS_CACHE_GENERATION_KEY = "forms:generation"
+FORMS_PAGE_SIZE = 50
+# Only the first few default-size pages are cached, so each generation holds at
+# most FORMS_CACHED_PAGES listing keys whatever skip/limit clients send
+FORMS_CACHED_PAGES = int(os.environ.get('FORMS_CACHED_PAGES', '5'))
+# Last known listing pages, kept across writes and served if MongoDB is unreachable
+FORMS_STALE_CACHE_TTL = int(os.environ.get('FORMS_STALE_CACHE_TTL', '86400'))
+FORMS_CACHE_FALLBACK = os.environ.get('FORMS_CACHE_FALLBACK', 'true').lower() == 'true'
+
+# Create the main app without a prefix, encoding responses with orjson
+app = FastAPI(default_response_class=ORJSONResponse)
+
+@app.exception_handler(PyMongoError)
+async def mongo_error_handler(request: Request, exc: PyMongoError):
+    logger.error("MongoDB error on %s: %s", request.url.path, exc)
+    return ORJSONResponse(status_code=503, content={"detail": "Database unavailable"})
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -30,7 +74,7 @@ api_router = APIRouter(prefix="/api")
 class StatusCheck(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     client_name: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class StatusCheckCreate(BaseModel):
     client_name: str
@@ -55,11 +99,112 @@ class FormCreate(BaseModel):
     fields: List[FormField]
 
 class Form(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    # Stored as the MongoDB _id, returned to clients as id
+    id: str = Field(
+        default_factory=lambda: str(uuid.uuid4()),
+        validation_alias=AliasChoices("id", "_id")
+    )
     name: str
     fields: List[Dict[str, Any]]
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # Always set by the handler that writes the form
+    updated_at: datetime
+
+class FormSummary(BaseModel):
+    id: str
+    name: str
+    created_at: datetime
+    updated_at: datetime
+
+def bson_now() -> datetime:
+    # BSON dates keep milliseconds only; truncating up front keeps write
+    # responses identical to what later reads return
+    now = datetime.now(timezone.utc)
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+def form_document(form: Form) -> Dict[str, Any]:
+    doc = form.model_dump(exclude={"id"})
+    doc["_id"] = form.id
+    return doc
+
+# Fields returned by the form listing, kept in one index so the query is covered.
+# The index leads with the listing's sort order so pages stay stable as forms are added.
+FORM_SUMMARY_PROJECTION = {"_id": 1, "name": 1, "created_at": 1, "updated_at": 1}
+FORM_SUMMARY_SORT = [("created_at", ASCENDING), ("_id", ASCENDING)]
+FORM_SUMMARY_INDEX = "form_summary_by_created_at"
+
+def form_cache_key(generation: int, form_id: str) -> str:
+    return f"form:{generation}:{form_id}"
+
+def forms_cached_page(skip: int, limit: int) -> Optional[int]:
+    if limit != FORMS_PAGE_SIZE or skip % FORMS_PAGE_SIZE:
+        return None
+    page = skip // FORMS_PAGE_SIZE
+    return page if page < FORMS_CACHED_PAGES else None
+
+def forms_page_key(generation: int, page: int) -> str:
+    return f"forms:{generation}:{page}"
+
+def forms_stale_key(page: int) -> str:
+    return f"forms:stale:{page}"
+
+async def cache_get(key: str) -> Optional[bytes]:
+    if cache is None:
+        return None
+    try:
+        return await cache.get(key)
+    except RedisError as e:
+        logger.warning("Cache read failed for %s: %s", key, e)
+        return None
+
+async def cache_set(key: str, body: bytes, ttl: int = CACHE_TTL):
+    if cache is None:
+        return
+    try:
+        await cache.set(key, body, ex=ttl)
+    except RedisError as e:
+        logger.warning("Cache write failed for %s: %s", key, e)
+
+async def cache_generation() -> int:
+    return int(await cache_get(FORMS_CACHE_GENERATION_KEY) or 0)
+
+async def invalidate_form_cache():
+    if cache is None:
+        return
+    try:
+        await cache.incr(FORMS_CACHE_GENERATION_KEY)
+    except RedisError as e:
+        logger.warning("Cache invalidation failed: %s", e)
+
+def encode_json(content: Any) -> bytes:
+    # Write UTC datetimes with a Z suffix, matching Pydantic's response_model output
+    return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+def json_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+async def stream_form_summaries(
+    first_form: Optional[Dict[str, Any]], cursor, page_key: Optional[str], stale_key: Optional[str]
+):
+    # Emit a JSON array one document at a time, caching the full body once done
+    chunks = [b"["]
+    yield chunks[0]
+    form = first_form
+    while form is not None:
+        form["id"] = form.pop("_id")
+        chunk = (b"," if len(chunks) > 1 else b"") + encode_json(form)
+        chunks.append(chunk)
+        yield chunk
+        form = await anext(cursor, None)
+    chunks.append(b"]")
+    yield chunks[-1]
+    if page_key is None:
+        return
+    body = b"".join(chunks)
+    writes = [cache_set(page_key, body)]
+    if FORMS_CACHE_FALLBACK:
+        writes.append(cache_set(stale_key, body, ttl=FORMS_STALE_CACHE_TTL))
+    await asyncio.gather(*writes)
 
 # Add your routes to the router instead of directly to app
 @api_router.get("/")
@@ -68,146 +213,178 @@ async def root():
 
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input: StatusCheckCreate):
-    status_dict = input.dict()
-    status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
-    return status_obj
+    # Timestamp is stored as a native BSON date, so reads need no conversion
+    status_doc = {
+        "id": str(uuid.uuid4()),
+        "client_name": input.client_name,
+        "timestamp": bson_now()
+    }
+    # Insert a copy so the generated ObjectId _id stays out of the response
+    await db.status_checks.insert_one(dict(status_doc))
+    return status_doc
 
-@api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+@api_router.post("/status/bulk", response_model=List[StatusCheck])
+async def create_status_checks_bulk(inputs: List[StatusCheckCreate]):
+    now = bson_now()
+    status_docs = [
+        {"id": str(uuid.uuid4()), "client_name": status_input.client_name, "timestamp": now}
+        for status_input in inputs
+    ]
+    # Write the whole batch in one round-trip; insert_many rejects an empty list.
+    # Insert copies so the generated ObjectId _ids stay out of the response.
+    if status_docs:
+        await db.status_checks.insert_many(
+            [dict(status_doc) for status_doc in status_docs],
+            ordered=False
+        )
+    return status_docs
+
+@api_router.get("/status", responses={200: {"model": List[StatusCheck]}})
+async def get_status_checks(skip: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=1000)):
+    # Sorting on the built-in _id index keeps pages stable in roughly insertion order
+    cursor = db.status_checks.find(
+        {}, projection={"_id": 0}
+    ).sort("_id", ASCENDING).skip(skip).limit(limit).batch_size(limit)
+    status_checks = await cursor.to_list(None)
+    # Documents were validated on insert; orjson encodes their datetimes natively
+    return json_response(encode_json(status_checks))
 
 # Form Builder API Endpoints
 @api_router.post("/forms", response_model=Form)
 async def create_form(form_data: FormCreate):
+    now = bson_now()
+    # FormCreate has already validated the fields, so skip a second pass
+    form = Form.model_construct(
+        name=form_data.name,
+        fields=form_data.model_dump()["fields"],
+        created_at=now,
+        updated_at=now
+    )
+    
+    # insert_one raises on failure, so the in-memory form is what was stored
+    await db.forms.insert_one(form_document(form))
+    await invalidate_form_cache()
+    return form
+
+# Reads return pre-encoded JSON; the models only document the response shape
+@api_router.get("/forms", responses={200: {"model": List[FormSummary]}})
+async def get_forms(skip: int = Query(0, ge=0), limit: int = Query(FORMS_PAGE_SIZE, ge=1, le=1000)):
+    # Serve the pre-serialized listing straight from the cache when present
+    page = forms_cached_page(skip, limit) if cache is not None else None
+    page_key = stale_key = None
+    if page is not None:
+        page_key = forms_page_key(await cache_generation(), page)
+        stale_key = forms_stale_key(page)
+        cached = await cache_get(page_key)
+        if cached is not None:
+            return json_response(cached)
+
+    # Only fetch the listing fields; the hint keeps the read on the covering index.
+    # Matching batch_size to the page size returns the page in one network batch.
+    cursor = db.forms.find(
+        {}, projection=FORM_SUMMARY_PROJECTION
+    ).sort(FORM_SUMMARY_SORT).hint(FORM_SUMMARY_INDEX).skip(skip).limit(limit).batch_size(limit)
+
+    # Pull the first document here so an unreachable MongoDB surfaces before
+    # the response starts streaming
     try:
-        form = Form(
-            name=form_data.name,
-            fields=[field.dict() for field in form_data.fields]
-        )
-        
-        result = await db.forms.insert_one(form.dict())
-        created_form = await db.forms.find_one({"_id": result.inserted_id})
-        
-        # Convert MongoDB _id to string id for response
-        if created_form:
-            created_form["id"] = str(created_form.pop("_id"))
-            return Form(**created_form)
-        else:
-            raise HTTPException(status_code=500, detail="Failed to create form")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-@api_router.get("/forms", response_model=List[Form])
-async def get_forms():
-    try:
-        forms = await db.forms.find().to_list(100)
-        # Convert MongoDB _id to string id for each form
-        for form in forms:
-            form["id"] = str(form.pop("_id"))
-        return forms
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-@api_router.get("/forms/{form_id}", response_model=Form)
+        first_form = await anext(cursor, None)
+    except ServerSelectionTimeoutError:
+        stale = await cache_get(stale_key) if FORMS_CACHE_FALLBACK and stale_key else None
+        if stale is None:
+            raise
+        response = json_response(stale)
+        response.headers["Warning"] = '110 - "Response is Stale"'
+        return response
+
+    return StreamingResponse(
+        stream_form_summaries(first_form, cursor, page_key, stale_key),
+        media_type="application/json"
+    )
+
+@api_router.get("/forms/{form_id}", responses={200: {"model": Form}})
 async def get_form(form_id: str):
-    try:
-        # Try to find the form by id field first
-        form = await db.forms.find_one({"id": form_id})
+    # Read the generation before MongoDB so a concurrent write retires this key
+    cache_key = form_cache_key(await cache_generation(), form_id)
+    cached = await cache_get(cache_key)
+    if cached is not None:
+        return json_response(cached)
+
+    form = await db.forms.find_one({"_id": form_id})
         
-        # If not found, check for MongoDB _id (but as string)
-        if not form:
-            form = await db.forms.find_one({"_id": form_id})
-            
-        if not form:
-            raise HTTPException(status_code=404, detail="Form not found")
-            
-        # Convert MongoDB _id to string id for response if needed
-        if "_id" in form and "id" not in form:
-            form["id"] = str(form.pop("_id"))
-            
-        return form
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    if not form:
+        raise HTTPException(status_code=404, detail="Form not found")
+
+    # Stored documents were validated on write, so encode them as-is
+    form["id"] = form.pop("_id")
+    body = encode_json(form)
+    await cache_set(cache_key, body)
+    return json_response(body)
 
 @api_router.put("/forms/{form_id}", response_model=Form)
 async def update_form(form_id: str, form_data: FormCreate):
-    try:
-        # Update with new data and set updated_at timestamp
-        form_dict = {
-            "name": form_data.name,
-            "fields": [field.dict() for field in form_data.fields],
-            "updated_at": datetime.utcnow()
-        }
-        
-        # Try to update by id field first
-        result = await db.forms.update_one(
-            {"id": form_id},
-            {"$set": form_dict}
-        )
+    # Update with new data and set updated_at timestamp
+    form_dict = {
+        "name": form_data.name,
+        "fields": form_data.model_dump()["fields"],
+        "updated_at": datetime.now(timezone.utc)
+    }
+    
+    # Update and fetch the updated form in a single atomic round-trip
+    updated_form = await db.forms.find_one_and_update(
+        {"_id": form_id},
+        {"$set": form_dict},
+        return_document=ReturnDocument.AFTER
+    )
         
-        # If not found, try to update by MongoDB _id
-        if result.modified_count == 0:
-            result = await db.forms.update_one(
-                {"_id": form_id},
-                {"$set": form_dict}
-            )
-            
-        if result.modified_count == 0:
-            raise HTTPException(status_code=404, detail="Form not found")
-            
-        # Get the updated form
-        updated_form = await get_form(form_id)
-        return updated_form
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    if updated_form is None:
+        raise HTTPException(status_code=404, detail="Form not found")
+
+    await invalidate_form_cache()
+
+    return Form(**updated_form)
 
 @api_router.delete("/forms/{form_id}")
 async def delete_form(form_id: str):
-    try:
-        # Try to delete by id field first
-        result = await db.forms.delete_one({"id": form_id})
+    result = await db.forms.delete_one({"_id": form_id})
+        
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Form not found")
+
+    await invalidate_form_cache()
         
-        # If not found, try to delete by MongoDB _id
-        if result.deleted_count == 0:
-            result = await db.forms.delete_one({"_id": form_id})
-            
-        if result.deleted_count == 0:
-            raise HTTPException(status_code=404, detail="Form not found")
-            
-        return {"message": "Form deleted successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return {"message": "Form deleted successfully"}
 
 # Laravel API placeholder endpoints
 @api_router.post("/laravel/forms", response_model=Dict[str, Any])
 async def laravel_create_form(form_data: FormCreate):
     # This is a placeholder for the Laravel API endpoint
     # In production, this would make a request to the Laravel API
+    now = datetime.now(timezone.utc)
     return {
         "id": str(uuid.uuid4()),
         "name": form_data.name,
-        "fields": [field.dict() for field in form_data.fields],
-        "created_at": datetime.utcnow().isoformat(),
+        "fields": form_data.model_dump()["fields"],
+        "created_at": now.isoformat(),
         "message": "Form saved to Laravel API (placeholder)"
     }
 
 @api_router.get("/laravel/forms", response_model=List[Dict[str, Any]])
 async def laravel_get_forms():
     # Placeholder that would fetch forms from Laravel API
+    now = datetime.now(timezone.utc).isoformat()
     return [
         {
             "id": str(uuid.uuid4()),
             "name": "Contact Form",
             "fields_count": 15,
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": now
         },
         {
             "id": str(uuid.uuid4()),
             "name": "Survey Form",
             "fields_count": 8,
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": now
         }
     ]
 
@@ -229,6 +406,24 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def warm_db_pool():
+    # Open the first pooled connection before serving traffic
+    await client.admin.command("ping")
+
+@app.on_event("startup")
+async def create_db_indexes():
+    # Forms are looked up through the built-in _id index. create_indexes builds
+    # all of a collection's indexes in a single command. Forms stored before the
+    # UUID became the _id are rewritten by migrate_form_ids.py, which
+    # entrypoint.sh runs before Uvicorn starts.
+    await db.forms.create_indexes([
+        IndexModel(
+            FORM_SUMMARY_SORT + [("name", ASCENDING), ("updated_at", ASCENDING)],
+            name=FORM_SUMMARY_INDEX,
+        ),
+    ])
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()
@@ -4,9 +4,15 @@ set -e
 # Start the FastAPI backend
 cd /backend || { echo "Backend directory not found"; exit 1; }
 
+# Rewrite any forms still keyed by ObjectId before the workers start serving
+echo "Migrating form ids"
+python3 migrate_form_ids.py
+
 echo "Starting FastAPI backend"
-# Start Uvicorn with proper host binding
-uvicorn server:app --host 0.0.0.0 --port 8001 &
+# Start Uvicorn with proper host binding, using the uvloop event loop and httptools parser
+uvicorn server:app --host 0.0.0.0 --port 8001 \
+    --loop uvloop --http httptools \
+    --workers "${UVICORN_WORKERS:-$(nproc)}" &
 BACKEND_PID=$!
 
 echo "Waiting for backend to start..."
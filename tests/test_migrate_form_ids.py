@@ -0,0 +1,86 @@
+import asyncio
+import sys
+from pathlib import Path
+
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from migrate_form_ids import migrate_legacy_form_ids  # noqa: E402
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = iter(docs)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.docs)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeForms:
+    """Just enough of a Motor collection for the migration."""
+
+    def __init__(self, docs=()):
+        self.docs = {doc["_id"]: dict(doc) for doc in docs}
+
+    def find(self, query):
+        assert query == {"id": {"$exists": True}}
+        return FakeCursor([dict(doc) for doc in self.docs.values() if "id" in doc])
+
+    async def insert_one(self, doc):
+        if doc["_id"] in self.docs:
+            raise DuplicateKeyError("duplicate key")
+        self.docs[doc["_id"]] = dict(doc)
+
+    async def update_one(self, query, update):
+        doc = self.docs[query["_id"]]
+        for key in update["$unset"]:
+            doc.pop(key, None)
+
+    async def delete_one(self, query):
+        self.docs.pop(query["_id"], None)
+
+
+def test_legacy_form_is_rewritten_with_uuid_id():
+    legacy_id = ObjectId()
+    forms = FakeForms([{"_id": legacy_id, "id": "uuid-1", "name": "Contact", "fields": []}])
+
+    assert asyncio.run(migrate_legacy_form_ids(forms)) == 1
+
+    assert forms.docs == {"uuid-1": {"_id": "uuid-1", "name": "Contact", "fields": []}}
+
+
+def test_migrated_forms_are_left_alone():
+    forms = FakeForms([{"_id": "uuid-1", "name": "Contact", "fields": []}])
+
+    assert asyncio.run(migrate_legacy_form_ids(forms)) == 0
+
+    assert forms.docs == {"uuid-1": {"_id": "uuid-1", "name": "Contact", "fields": []}}
+
+
+def test_form_already_rewritten_drops_the_legacy_copy():
+    legacy_id = ObjectId()
+    forms = FakeForms([
+        {"_id": legacy_id, "id": "uuid-1", "name": "Contact", "fields": []},
+        {"_id": "uuid-1", "name": "Contact", "fields": []},
+    ])
+
+    asyncio.run(migrate_legacy_form_ids(forms))
+
+    assert list(forms.docs) == ["uuid-1"]
+
+
+def test_form_with_uuid_in_both_fields_drops_id_only():
+    forms = FakeForms([{"_id": "uuid-1", "id": "uuid-1", "name": "Contact", "fields": []}])
+
+    asyncio.run(migrate_legacy_form_ids(forms))
+
+    assert forms.docs == {"uuid-1": {"_id": "uuid-1", "name": "Contact", "fields": []}}
+